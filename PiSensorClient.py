@@ -26,10 +26,29 @@ pi_sensor.disconnect()
 """
 
 from dataclasses import dataclass
-import json
-from typing import Optional
+from typing import Optional, Union
+import msgpack
 import serial
 from SensorType import EnvironmentData, MotionData, Orientation, Vector3D, SensorData
+from SensorCodec import FRAME_HEADER, DeltaDecoder, unpack_sensor_data
+
+try:
+    # orjsonがあれば高速なデコーダーを使う（任意）
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+
+# ----------
+# ---送信コマンド（終端まで含めたバイト列）
+# ----------
+CMD_GET_SENSOR_DATA = b"get_sensor_data\r\n"
+CMD_GET_SENSOR_DATA_MSGPACK = b"get_sensor_data_msgpack\r\n"
+CMD_GET_SENSOR_DATA_BIN = b"get_sensor_data_bin\r\n"
+CMD_GET_SENSOR_DATA_DELTA = b"get_sensor_data_delta\r\n"
+CMD_GET_SENSOR_DATA_KEYFRAME = b"get_sensor_data_keyframe\r\n"
+CMD_PING = b"ping\r\n"
+CMD_STATUS = b"status\r\n"
 
 
 # ----------
@@ -66,10 +85,23 @@ class PiSensorClient:
     外部センサーとして楽に使用するためのクラス。
     """
 
-    def __init__(self, port: str, baudrate: int = 9600):
+    def __init__(self, port: str, baudrate: int = 9600, protocol: str = "json"):
+        """
+        Args:
+            port: シリアルポート名
+            baudrate: 通信速度
+            protocol: センサーデータの転送形式。"json"、"msgpack"、"binary"、"delta" のいずれか。
+                "msgpack" はペイロードが小さく、低速な回線で有利。
+                "binary" は固定長のバイナリで、デコードが最も軽い。
+                "delta" は前回値からの差分のみを受信するため、連続取得時に最も小さい。
+        """
+        if protocol not in ("json", "msgpack", "binary", "delta"):
+            raise ValueError(f"未対応のプロトコル: {protocol}")
         self.port = port
         self.baudrate = baudrate
+        self.protocol = protocol
         self.serial_conn: Optional[serial.Serial] = None
+        self._delta_decoder = DeltaDecoder()
 
     # ----------
     # ---シリアル通信関連のメソッド
@@ -81,6 +113,13 @@ class PiSensorClient:
             self.serial_conn = serial.Serial(
                 port=self.port, baudrate=self.baudrate, timeout=2.0
             )
+            # USBシリアル変換器の遅延タイマー（FTDIは既定16ms）を最小にする。
+            # Linux以外や非対応のデバイスでは失敗するため、その場合はそのまま使用する。
+            try:
+                self.serial_conn.set_low_latency_mode(True)
+            except (AttributeError, ValueError, OSError):
+                pass
+            self._delta_decoder.reset()
             return True
         except serial.SerialException as e:
             print(f"接続エラー: {e}")
@@ -91,26 +130,55 @@ class PiSensorClient:
         if self.serial_conn and self.serial_conn.is_open:
             self.serial_conn.close()
 
-    def send_command(self, command: str) -> Optional[dict]:
-        """コマンドを送信し、応答を取得"""
+    def send_command(self, command: bytes) -> Optional[dict]:
+        """コマンドを送信し、応答を取得
+
+        Args:
+            command: 終端の\\r\\nまで含めたコマンド（CMD_*定数）
+        """
         if not self.serial_conn or not self.serial_conn.is_open:
             raise ValueError("シリアル接続が開かれていません")
         try:
             # コマンド送信
-            cmd_bytes = f"{command}\r\n".encode("utf-8")
-            self.serial_conn.write(cmd_bytes)
-            self.serial_conn.flush()
-            # 応答受信
-            response = self.serial_conn.readline()
+            self.serial_conn.write(command)
+            # 応答受信（json_loadsはバイト列をそのまま受け付ける）
+            response = self._read_line()
             if response:
-                decoded = response.decode("utf-8", errors="replace").strip()
-                response_json = json.loads(decoded)
-                return response_json
+                return json_loads(response)
             else:
                 raise ValueError("応答がありません")
         except Exception as e:
             raise ValueError(f"コマンド送信エラー: {e}")
 
+    def send_binary_command(self, command: bytes) -> Union[bytes, dict]:
+        """コマンドを送信し、長さヘッダー付きのバイナリ応答を取得
+
+        エラー時はサーバーがJSON行で応答するため、その場合はJSONとして解釈した辞書を返す。
+
+        Args:
+            command: 終端の\\r\\nまで含めたコマンド（CMD_*定数）
+        """
+        if not self.serial_conn or not self.serial_conn.is_open:
+            raise ValueError("シリアル接続が開かれていません")
+        try:
+            # コマンド送信
+            self.serial_conn.write(command)
+            # 応答受信
+            header = self.serial_conn.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                raise ValueError("応答がありません")
+            if header.startswith(b"{"):
+                # JSON形式のエラー応答
+                response = header + self._read_line()
+                return json_loads(response)
+            (length,) = FRAME_HEADER.unpack(header)
+            payload = self.serial_conn.read(length)
+            if len(payload) < length:
+                raise ValueError("応答が途中で途切れました")
+            return payload
+        except Exception as e:
+            raise ValueError(f"コマンド送信エラー: {e}")
+
     # ----------
     # ---ユーザー向けメソッド
     # ----------
@@ -118,22 +186,18 @@ class PiSensorClient:
     def get_sensor_data(self) -> Optional[SensorData]:
         """センサーデータを取得"""
         try:
-            command = "get_sensor_data"
-            response = self.send_command(command)
+            if self.protocol == "delta":
+                return self._get_sensor_data_delta()
+            if self.protocol == "binary":
+                return self._get_sensor_data_binary()
+            if self.protocol == "msgpack":
+                response = self.send_binary_command(CMD_GET_SENSOR_DATA_MSGPACK)
+                if isinstance(response, bytes):
+                    response = msgpack.unpackb(response, raw=False)
+            else:
+                response = self.send_command(CMD_GET_SENSOR_DATA)
             if not self.is_error(response):
-                environment = EnvironmentData(**response["environment"])
-                motion_dict = response["motion"]
-                orientation = Orientation(**motion_dict["orientation"])
-                acceleration = Vector3D(**motion_dict["acceleration"])
-                gyroscope = Vector3D(**motion_dict["gyroscope"])
-                magnetic = Vector3D(**motion_dict["magnetic"])
-                motion = MotionData(
-                    orientation=orientation,
-                    acceleration=acceleration,
-                    gyroscope=gyroscope,
-                    magnetic=magnetic,
-                )
-                return SensorData(environment=environment, motion=motion)
+                return self._sensor_data_from_dict(response)
             else:
                 raise ValueError(f"センサーデータがありません: {response.get('error')}")
         except Exception as e:
@@ -142,8 +206,7 @@ class PiSensorClient:
     def get_status(self) -> Optional[str]:
         """センサーの状態を取得"""
         try:
-            command = "status"
-            response = self.send_command(command)
+            response = self.send_command(CMD_STATUS)
             if not self.is_error(response):
                 return PiSensorStatus(**response)
             else:
@@ -154,8 +217,7 @@ class PiSensorClient:
     def ping(self) -> Optional[str]:
         """センサーへのpingを送信"""
         try:
-            command = "ping"
-            response = self.send_command(command)
+            response = self.send_command(CMD_PING)
             if not self.is_error(response):
                 return PiSensorPing(**response)
             else:
@@ -166,6 +228,70 @@ class PiSensorClient:
     # ----------
     # ---内部メソッド
     # ----------
+    @staticmethod
+    def _sensor_data_from_dict(response: dict) -> SensorData:
+        """JSON/MessagePackの応答（辞書）からセンサーデータを復元する
+
+        **kwargsの展開を避け、各フィールドを直接取り出して位置引数で渡す。
+        """
+        e = response["environment"]
+        m = response["motion"]
+        o = m["orientation"]
+        a = m["acceleration"]
+        g = m["gyroscope"]
+        mag = m["magnetic"]
+        return SensorData(
+            EnvironmentData(
+                e["temperature"], e["humidity"], e["pressure"], e["light"], e["uv"], e["voc"]
+            ),
+            MotionData(
+                Orientation(o["roll"], o["pitch"], o["yaw"]),
+                Vector3D(a["x"], a["y"], a["z"]),
+                Vector3D(g["x"], g["y"], g["z"]),
+                Vector3D(mag["x"], mag["y"], mag["z"]),
+            ),
+        )
+
+    def _read_line(self) -> bytes:
+        """改行までの応答を読み取る
+
+        readline()は1バイトずつread()するため、最初の1バイトを待った後は
+        受信済みのバイトをまとめて読み取る。応答は1コマンドにつき1行のため、
+        改行以降を読み過ぎることはない。
+
+        Returns:
+            bytes: 改行までの応答。タイムアウト時は途中までの応答
+        """
+        buf = bytearray()
+        while not buf.endswith(b"\n"):
+            chunk = self.serial_conn.read(self.serial_conn.in_waiting or 1)
+            if not chunk:
+                break
+            buf += chunk
+        return bytes(buf)
+
+    def _get_sensor_data_binary(self) -> SensorData:
+        """固定長バイナリでセンサーデータを取得する"""
+        response = self.send_binary_command(CMD_GET_SENSOR_DATA_BIN)
+        if isinstance(response, bytes):
+            return unpack_sensor_data(response)
+        raise ValueError(f"センサーデータがありません: {response.get('error')}")
+
+    def _get_sensor_data_delta(self) -> SensorData:
+        """差分フレームでセンサーデータを取得する
+
+        基準となるフレームを持っていない場合は、キーフレームを要求し直す。
+        """
+        response = self.send_binary_command(CMD_GET_SENSOR_DATA_DELTA)
+        if isinstance(response, bytes):
+            data = self._delta_decoder.decode(response)
+            if data is not None:
+                return data
+            response = self.send_binary_command(CMD_GET_SENSOR_DATA_KEYFRAME)
+            if isinstance(response, bytes):
+                return self._delta_decoder.decode(response)
+        raise ValueError(f"センサーデータがありません: {response.get('error')}")
+
     def is_error(self, response: Optional[dict]) -> bool:
         """responseがエラーかどうかを確認する
 
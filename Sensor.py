@@ -48,7 +48,7 @@ data = sensor_hub.read_all()
 
 """
 
-from typing import Union
+from typing import List, Optional, Tuple, Union
 import time
 from modules import ICM20948  # Gyroscope/Acceleration/Magnetometer
 from modules import MPU925x  # Gyroscope/Acceleration/Magnetometer
@@ -102,31 +102,58 @@ class SensorHub:
             return MPU925x.MPU925x()
         raise RuntimeError("No compatible motion sensor detected")
 
-    def read_environment(self) -> EnvironmentData:
-        """環境センサーの値を読み取る
+    def _read_values(
+        self, motion: bool = True
+    ) -> Tuple[Tuple[float, float, float, float, int, float], Optional[List[float]]]:
+        """センサーの値を読み取る
+
+        SGP40の測定（約250ms）を最初に開始し、その待ち時間の間に他のセンサーを読み取る。
+
+        Args:
+            motion: モーションセンサーも読み取るかどうか
 
         Returns:
-            EnvironmentData: 環境センサーの測定値
+            Tuple: EnvironmentDataのフィールド順の環境センサー値と、
+                モーションセンサー値（motion=Falseの場合はNone）
         """
-        bme_data = self.bme280.readData()
+        self.sgp.start_raw()
+        voc_ready_at = time.monotonic() + SGP40.RAW_MEASURE_TIME
 
-        return EnvironmentData(
-            temperature=round(bme_data[1], 2),
-            humidity=round(bme_data[2], 2),
-            pressure=round(bme_data[0], 2),
-            light=round(self.light.Lux(), 2),
-            uv=self.uv.UVS(),
-            voc=round(self.sgp.raw(), 2),
+        bme_data = self.bme280.readData()
+        light = self.light.Lux()
+        uv = self.uv.UVS()
+        motion_values = self._read_motion_values() if motion else None
+
+        remaining = voc_ready_at - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+        voc = self.sgp.read_raw()
+
+        environment_values = (
+            round(bme_data[1], 2),
+            round(bme_data[2], 2),
+            round(bme_data[0], 2),
+            round(light, 2),
+            uv,
+            round(voc, 2),
         )
+        return environment_values, motion_values
 
-    def read_motion(self) -> MotionData:
+    def _read_motion_values(self) -> List[float]:
         """モーションセンサーの値を読み取る
 
+        姿勢角は環境センサーと同じく小数点以下2桁に丸める。
+        加速度・ジャイロ・磁気はセンサーの生値（カウント）のため、平均化やオフセット補正で
+        生じる端数のみを小数点以下3桁に丸める。
+
         Returns:
-            MotionData: モーションセンサーの測定値
+            List[float]: roll, pitch, yaw, 加速度xyz, ジャイロxyz, 磁気xyzの順の12要素
         """
         data = self.mpu.getdata()
+        return [round(v, 2) for v in data[0:3]] + [round(v, 3) for v in data[3:12]]
 
+    def _to_motion_data(self, data: List[float]) -> MotionData:
+        """モーションセンサーの値をMotionDataに変換する"""
         return MotionData(
             orientation=Orientation(data[0], data[1], data[2]),
             acceleration=Vector3D(data[3], data[4], data[5]),
@@ -134,14 +161,33 @@ class SensorHub:
             magnetic=Vector3D(data[9], data[10], data[11]),
         )
 
+    def read_environment(self) -> EnvironmentData:
+        """環境センサーの値を読み取る
+
+        Returns:
+            EnvironmentData: 環境センサーの測定値
+        """
+        environment_values, _ = self._read_values(motion=False)
+        return EnvironmentData(*environment_values)
+
+    def read_motion(self) -> MotionData:
+        """モーションセンサーの値を読み取る
+
+        Returns:
+            MotionData: モーションセンサーの測定値
+        """
+        return self._to_motion_data(self._read_motion_values())
+
     def read_all(self) -> SensorData:
         """全センサーの値を読み取る
 
         Returns:
             SensorData: 全センサーの測定値
         """
+        environment_values, motion_values = self._read_values()
         return SensorData(
-            environment=self.read_environment(), motion=self.read_motion()
+            environment=EnvironmentData(*environment_values),
+            motion=self._to_motion_data(motion_values),
         )
 
 
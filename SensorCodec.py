@@ -0,0 +1,241 @@
+"""
+# SensorCodec.py
+センサーデータをシリアル回線向けのバイナリ形式に変換するためのモジュール。
+sensor-serial-server.pyとPiSensorClient.pyの両方から使用する。
+
+## フレーム形式
+バイナリ応答は、4バイトのビッグエンディアン長さヘッダーに続くペイロードで構成される。
+
+## 固定長フレーム
+固定長フレームのペイロードは、FIELDSの順に並べた値をSENSOR_STRUCTでパックしたもの。
+各フィールドの型と倍率は差分フレームと同じ（FIELDSから生成する）。
+
+## 差分フレーム
+差分フレームのペイロードは以下の形式。
+- 1バイト: フラグ（bit0: キーフレーム）
+- 1バイト: シーケンス番号（0〜255で循環）
+- 3バイト: 変化したフィールドのビットマップ（リトルエンディアン）
+- 変化したフィールドの値（FIELDSの順、各フィールドの型でパック）
+
+キーフレームは全フィールドを含む。差分フレームは直前に送信したフレームからの差分のみを含むため、
+クライアントはシーケンス番号が連続していない場合、キーフレームを要求し直す必要がある。
+"""
+
+import struct
+from typing import List, Optional, Tuple
+from SensorType import EnvironmentData, MotionData, Orientation, Vector3D, SensorData
+
+
+# 長さヘッダー
+FRAME_HEADER = struct.Struct(">I")
+
+# 各フィールドの(パック形式, 倍率)。倍率がNoneの場合はfloatのままパックする。
+FIELDS: Tuple[Tuple[str, Optional[int]], ...] = (
+    ("<h", 100),  # temperature (0.01℃)
+    ("<H", 100),  # humidity (0.01%)
+    ("<I", 100),  # pressure (0.01hPa)
+    ("<I", 100),  # light (0.01lux)
+    ("<I", 1),  # uv
+    ("<H", 1),  # voc (SGP40の生値は16bit)
+    ("<h", 100),  # orientation.roll (0.01度)
+    ("<h", 100),  # orientation.pitch (0.01度)
+    ("<h", 100),  # orientation.yaw (0.01度)
+    ("<f", None),  # acceleration.x
+    ("<f", None),  # acceleration.y
+    ("<f", None),  # acceleration.z
+    ("<f", None),  # gyroscope.x
+    ("<f", None),  # gyroscope.y
+    ("<f", None),  # gyroscope.z
+    ("<f", None),  # magnetic.x
+    ("<f", None),  # magnetic.y
+    ("<f", None),  # magnetic.z
+)
+
+# 固定長フレームの形式（FIELDSの各形式を順に連結したもの）
+SENSOR_STRUCT = struct.Struct("<" + "".join(fmt[1:] for fmt, _ in FIELDS))
+
+_FIELD_STRUCTS = tuple(struct.Struct(fmt) for fmt, _ in FIELDS)
+_DELTA_HEADER = struct.Struct("<BB3s")
+_FLAG_KEYFRAME = 0x01
+_ALL_FIELDS = (1 << len(FIELDS)) - 1
+
+
+def pack_frame(payload: bytes) -> bytes:
+    """ペイロードに長さヘッダーを付与する
+
+    Args:
+        payload: 送信するペイロード
+
+    Returns:
+        bytes: 長さヘッダー付きのフレーム
+    """
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def _quantize(value: float, scale: Optional[int]) -> float:
+    """倍率に従ってパック用の値に変換する"""
+    return value if scale is None else int(round(value * scale))
+
+
+def _dequantize(raw: float, scale: Optional[int]) -> float:
+    """パックされた値を倍率に従って元の単位に戻す"""
+    return raw if scale is None or scale == 1 else raw / scale
+
+
+def pack_sensor_data(data: SensorData) -> bytes:
+    """センサーデータを固定長フレームのペイロードに変換する
+
+    Args:
+        data: センサーデータ
+
+    Returns:
+        bytes: SENSOR_STRUCTでパックしたペイロード
+    """
+    return SENSOR_STRUCT.pack(
+        *(_quantize(value, scale) for (_, scale), value in zip(FIELDS, flatten(data)))
+    )
+
+
+def unpack_sensor_data(payload: bytes) -> SensorData:
+    """固定長フレームのペイロードからセンサーデータを復元する
+
+    Args:
+        payload: SENSOR_STRUCTでパックしたペイロード
+
+    Returns:
+        SensorData: 復元したセンサーデータ
+    """
+    return unflatten(
+        tuple(
+            _dequantize(raw, scale)
+            for (_, scale), raw in zip(FIELDS, SENSOR_STRUCT.unpack(payload))
+        )
+    )
+
+
+def flatten(data: SensorData) -> Tuple[float, ...]:
+    """センサーデータをFIELDSの順に並べたタプルに変換する"""
+    env = data.environment
+    motion = data.motion
+    o = motion.orientation
+    a = motion.acceleration
+    g = motion.gyroscope
+    m = motion.magnetic
+    return (
+        env.temperature, env.humidity, env.pressure, env.light, env.uv, env.voc,
+        o.roll, o.pitch, o.yaw,
+        a.x, a.y, a.z,
+        g.x, g.y, g.z,
+        m.x, m.y, m.z,
+    )
+
+
+def unflatten(values: Tuple[float, ...]) -> SensorData:
+    """FIELDSの順に並んだ値からセンサーデータを復元する"""
+    return SensorData(
+        environment=EnvironmentData(*values[0:6]),
+        motion=MotionData(
+            orientation=Orientation(*values[6:9]),
+            acceleration=Vector3D(*values[9:12]),
+            gyroscope=Vector3D(*values[12:15]),
+            magnetic=Vector3D(*values[15:18]),
+        ),
+    )
+
+
+class DeltaEncoder:
+    """直前に送信したフレームとの差分のみを送るエンコーダー"""
+
+    def __init__(self, keyframe_interval: int = 10) -> None:
+        """
+        Args:
+            keyframe_interval: キーフレームを送信する間隔（フレーム数）
+        """
+        self.keyframe_interval = keyframe_interval
+        self._last_fields: Optional[List[bytes]] = None
+        self._frames_since_keyframe = 0
+        self._seq = 0
+
+    def reset(self) -> None:
+        """状態を破棄し、次のフレームをキーフレームにする"""
+        self._last_fields = None
+
+    def encode(self, data: SensorData) -> bytes:
+        """センサーデータを差分フレームに変換する
+
+        Args:
+            data: センサーデータ
+
+        Returns:
+            bytes: 差分フレームのペイロード
+        """
+        fields = [
+            s.pack(_quantize(value, scale))
+            for s, (_, scale), value in zip(_FIELD_STRUCTS, FIELDS, flatten(data))
+        ]
+
+        keyframe = (
+            self._last_fields is None
+            or self._frames_since_keyframe >= self.keyframe_interval
+        )
+        if keyframe:
+            bitmap = _ALL_FIELDS
+            self._frames_since_keyframe = 0
+        else:
+            bitmap = 0
+            for i, (new, old) in enumerate(zip(fields, self._last_fields)):
+                if new != old:
+                    bitmap |= 1 << i
+        self._frames_since_keyframe += 1
+        self._last_fields = fields
+        self._seq = (self._seq + 1) & 0xFF
+
+        header = _DELTA_HEADER.pack(
+            _FLAG_KEYFRAME if keyframe else 0,
+            self._seq,
+            bitmap.to_bytes(3, "little"),
+        )
+        return header + b"".join(f for i, f in enumerate(fields) if bitmap >> i & 1)
+
+
+class DeltaDecoder:
+    """DeltaEncoderで作成したフレームを復元するデコーダー"""
+
+    def __init__(self) -> None:
+        self._last_values: Optional[List[float]] = None
+        self._seq = 0
+
+    def reset(self) -> None:
+        """状態を破棄し、次にキーフレームを受信するまで復元できないようにする"""
+        self._last_values = None
+
+    def decode(self, payload: bytes) -> Optional[SensorData]:
+        """差分フレームからセンサーデータを復元する
+
+        Args:
+            payload: 差分フレームのペイロード
+
+        Returns:
+            Optional[SensorData]: 復元したセンサーデータ。
+                基準となるフレームを持っていない場合はNone（キーフレームの再要求が必要）。
+        """
+        flags, seq, bitmap_bytes = _DELTA_HEADER.unpack_from(payload)
+        keyframe = bool(flags & _FLAG_KEYFRAME)
+        if not keyframe and (
+            self._last_values is None or seq != (self._seq + 1) & 0xFF
+        ):
+            self._last_values = None
+            return None
+
+        bitmap = int.from_bytes(bitmap_bytes, "little")
+        values = [0.0] * len(FIELDS) if keyframe else list(self._last_values)
+        offset = _DELTA_HEADER.size
+        for i, (s, (_, scale)) in enumerate(zip(_FIELD_STRUCTS, FIELDS)):
+            if bitmap >> i & 1:
+                (raw,) = s.unpack_from(payload, offset)
+                offset += s.size
+                values[i] = _dequantize(raw, scale)
+
+        self._last_values = values
+        self._seq = seq
+        return unflatten(tuple(values))
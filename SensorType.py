@@ -1,5 +1,8 @@
 from dataclasses import dataclass
 
+# 各データクラスは__slots__を定義し、インスタンスごとの__dict__を持たないようにする。
+# (dataclass(slots=True)はPython 3.10以降のため、フィールド名を直接列挙している)
+
 
 @dataclass
 class Orientation:
@@ -11,10 +14,16 @@ class Orientation:
         yaw (float): ヨー角 (度)
     """
 
+    __slots__ = ("roll", "pitch", "yaw")
+
     roll: float
     pitch: float
     yaw: float
 
+    def to_dict(self) -> dict:
+        """辞書に変換する"""
+        return {"roll": self.roll, "pitch": self.pitch, "yaw": self.yaw}
+
 
 @dataclass
 class Vector3D:
@@ -26,10 +35,16 @@ class Vector3D:
         z (float): Z軸の値
     """
 
+    __slots__ = ("x", "y", "z")
+
     x: float
     y: float
     z: float
 
+    def to_dict(self) -> dict:
+        """辞書に変換する"""
+        return {"x": self.x, "y": self.y, "z": self.z}
+
 
 @dataclass
 class MotionData:
@@ -42,11 +57,22 @@ class MotionData:
         magnetic (Vector3D): 磁気センサーデータ
     """
 
+    __slots__ = ("orientation", "acceleration", "gyroscope", "magnetic")
+
     orientation: Orientation
     acceleration: Vector3D
     gyroscope: Vector3D
     magnetic: Vector3D
 
+    def to_dict(self) -> dict:
+        """辞書に変換する"""
+        return {
+            "orientation": self.orientation.to_dict(),
+            "acceleration": self.acceleration.to_dict(),
+            "gyroscope": self.gyroscope.to_dict(),
+            "magnetic": self.magnetic.to_dict(),
+        }
+
 
 @dataclass
 class EnvironmentData:
@@ -61,6 +87,8 @@ class EnvironmentData:
         voc (float): VOC値
     """
 
+    __slots__ = ("temperature", "humidity", "pressure", "light", "uv", "voc")
+
     temperature: float
     humidity: float
     pressure: float
@@ -68,6 +96,17 @@ class EnvironmentData:
     uv: int
     voc: float
 
+    def to_dict(self) -> dict:
+        """辞書に変換する"""
+        return {
+            "temperature": self.temperature,
+            "humidity": self.humidity,
+            "pressure": self.pressure,
+            "light": self.light,
+            "uv": self.uv,
+            "voc": self.voc,
+        }
+
 
 @dataclass
 class SensorData:
@@ -78,5 +117,17 @@ class SensorData:
         motion (MotionData): モーションセンサーデータ
     """
 
+    __slots__ = ("environment", "motion")
+
     environment: EnvironmentData
-    motion: MotionData
\ No newline at end of file
+    motion: MotionData
+
+    def to_dict(self) -> dict:
+        """辞書に変換する
+
+        dataclasses.asdictは再帰的にdeepcopyを行うため、フィールドを直接参照して変換する。
+        """
+        return {
+            "environment": self.environment.to_dict(),
+            "motion": self.motion.to_dict(),
+        }
@@ -44,6 +44,9 @@ WITH_HUM_COMP = [0x26, 0x0f, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00] #Manual input
 
 ADDR = 0x59
 
+# wait time between start_raw() and read_raw() (seconds)
+RAW_MEASURE_TIME = 0.25
+
 class SGP40:
     def __init__(self, address=ADDR):
         self.i2c = smbus.SMBus(1)
@@ -79,9 +82,17 @@ class SGP40:
         
     def raw(self):
         """The raw gas value"""
+        self.start_raw()
+        time.sleep(RAW_MEASURE_TIME)
+        return self.read_raw()
+
+    def start_raw(self):
+        """Start a raw measurement; the result is ready after RAW_MEASURE_TIME"""
         # recycle a single buffer
         self.write_block(WITHOUT_HUM_COMP)
-        time.sleep(0.25)
+
+    def read_raw(self):
+        """Read the result of a measurement started by start_raw()"""
         Rbuf = self.Read()
         return ((int(Rbuf[0]) << 8) | Rbuf[1])
         
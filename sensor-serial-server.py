@@ -15,18 +15,33 @@ Raspberry Pi Zero W Sensor Serial Server
 
 import serial
 import json
-import time
+import msgpack
 import logging
 import signal
 import sys
 import threading
+import time
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 from logging.handlers import RotatingFileHandler
-from dataclasses import asdict
+
+try:
+    # orjsonは任意（Pi Zero W(ARMv6)向けのwheelがないため、なければ標準のjsonを使う）
+    import orjson
+except ImportError:
+    orjson = None
 
 from Sensor import SensorHub
+from SensorCodec import DeltaEncoder, pack_frame, pack_sensor_data
+from SensorType import SensorData
+
+
+# 固定の応答
+PONG_RESPONSE = b'{"status": "pong"}\r\n'
+INVALID_COMMAND_RESPONSE = b'{"error": "invalid command"}\r\n'
+SENSOR_NOT_INITIALIZED_RESPONSE = b'{"error": "sensor not initialized"}\r\n'
+SENSOR_READ_FAILED_RESPONSE = b'{"error": "sensor read failed"}\r\n'
 
 
 class SerialServerConfig:
@@ -59,9 +74,9 @@ class SerialServerConfig:
                 "write_timeout": 1.0
             },
             "system": {
-                "loop_interval": 0.1,
                 "max_command_length": 256,
-                "shutdown_timeout": 5.0
+                "sample_interval": 1.0,
+                "delta_keyframe_interval": 10
             },
             "logging": {
                 "level": "INFO",
@@ -86,7 +101,32 @@ class SensorSerialServer:
         self.sensor_hub: Optional[SensorHub] = None
         self.serial_port: Optional[serial.Serial] = None
         self.running = False
-        self.shutdown_event = threading.Event()
+        # 停止要求の記録（一度Trueになったら戻さない）
+        self._stop_requested = False
+        # センサー読み取りスレッドが更新する最新のセンサーデータ（読み取り失敗時はNone）
+        self.latest_data: Optional[SensorData] = None
+        self._sensor_thread: Optional[threading.Thread] = None
+        self._sample_interval = self.config.get("system", "sample_interval", 1.0)
+        self.delta_encoder = DeltaEncoder(
+            self.config.get("system", "delta_keyframe_interval", 10)
+        )
+        # リクエストごとに参照する設定値
+        self._max_command_length = self.config.get("system", "max_command_length", 256)
+        # status応答の固定部分（ポート名は起動後に変化しない）
+        self._status_suffix = (
+            b', "port": ' + json.dumps(self.config.get("serial", "port")).encode('utf-8') + b'}\r\n'
+        )
+        
+        # コマンドと処理メソッドの対応表（受信したバイト列をそのままキーにする）
+        self._handlers: Dict[bytes, Callable[[], bytes]] = {
+            b"get_sensor_data": self._handle_get_sensor_data,
+            b"get_sensor_data_msgpack": self._handle_get_sensor_data_msgpack,
+            b"get_sensor_data_bin": self._handle_get_sensor_data_bin,
+            b"get_sensor_data_delta": self._handle_get_sensor_data_delta,
+            b"get_sensor_data_keyframe": self._handle_get_sensor_data_keyframe,
+            b"ping": self._handle_ping,
+            b"status": self._handle_status,
+        }
         
         # シグナルハンドラーの設定
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -141,6 +181,7 @@ class SensorSerialServer:
                 write_timeout=self.config.get("serial", "write_timeout", 1.0)
             )
             self.logger.info(f"シリアルポート {self.serial_port.port} を開きました")
+            self._enable_low_latency(self.serial_port)
             yield self.serial_port
         except serial.SerialException as e:
             self.logger.error(f"シリアルポートエラー: {e}")
@@ -150,6 +191,17 @@ class SensorSerialServer:
                 self.serial_port.close()
                 self.logger.info("シリアルポートを閉じました")
     
+    def _enable_low_latency(self, serial_port: serial.Serial):
+        """USBシリアル変換器の低レイテンシーモードを有効化（対応していない場合は何もしない）
+
+        FTDI等のUSBシリアル変換器は既定で16msの遅延タイマーを持つため、短い応答ごとに遅延が生じる。
+        """
+        try:
+            serial_port.set_low_latency_mode(True)
+            self.logger.info("シリアルポートの低レイテンシーモードを有効化しました")
+        except (AttributeError, ValueError, OSError) as e:
+            self.logger.debug(f"低レイテンシーモードは利用できません: {e}")
+    
     def _initialize_sensors(self) -> bool:
         """センサーを初期化"""
         try:
@@ -160,77 +212,128 @@ class SensorSerialServer:
             self.logger.error(f"センサー初期化エラー: {e}")
             return False
     
-    def _validate_command(self, command: str) -> bool:
-        """コマンドの検証"""
-        max_length = self.config.get("system", "max_command_length", 256)
-        
-        if len(command) > max_length:
-            self.logger.warning(f"コマンド長が上限を超過: {len(command)} > {max_length}")
-            return False
-        
-        # 許可されたコマンドのリスト
-        valid_commands = ["get_sensor_data", "ping", "status"]
-        
-        if command not in valid_commands:
-            self.logger.warning(f"無効なコマンド: {command}")
-            return False
-        
-        return True
+    def _sensor_producer(self):
+        """センサー読み取りスレッド
+
+        sample_intervalごとにセンサーを読み取り、latest_dataを更新する。
+        コマンド処理はlatest_dataを参照するため、応答時にI2C通信を待たない。
+        """
+        while self.running:
+            started_at = time.monotonic()
+            try:
+                # 参照の代入はアトミックなため、ロックは不要
+                self.latest_data = self.sensor_hub.read_all()
+            except Exception as e:
+                self.logger.error("センサー読み取りエラー: %s", e)
+                self.latest_data = None
+            
+            remaining = self._sample_interval - (time.monotonic() - started_at)
+            if remaining > 0:
+                time.sleep(remaining)
+    
+    def _start_sensor_producer(self):
+        """センサー読み取りスレッドを開始"""
+        self._sensor_thread = threading.Thread(
+            target=self._sensor_producer, name="SensorProducer", daemon=True
+        )
+        self._sensor_thread.start()
+    
+    def _sensor_unavailable_response(self) -> bytes:
+        """センサーデータがない場合の応答"""
+        if not self.sensor_hub:
+            return SENSOR_NOT_INITIALIZED_RESPONSE
+        return SENSOR_READ_FAILED_RESPONSE
     
-    def _process_command(self, command: str) -> bytes:
+    def _process_command(self, command: bytes) -> bytes:
         """コマンドを処理して応答を生成"""
+        if len(command) > self._max_command_length:
+            self.logger.warning("コマンド長が上限を超過: %d bytes", len(command))
+            return INVALID_COMMAND_RESPONSE
+        
+        handler = self._handlers.get(command)
+        if handler is None:
+            self.logger.warning("無効なコマンド: %r", command)
+            return INVALID_COMMAND_RESPONSE
+        
         try:
-            if command == "get_sensor_data":
-                if not self.sensor_hub:
-                    return b'{"error": "sensor not initialized"}\r\n'
-                
-                data = self.sensor_hub.read_all()
-                # dataclassを辞書に変換してJSONシリアライズ
-                data_dict = asdict(data)
-                response = json.dumps(data_dict, ensure_ascii=False)
-                self.logger.debug(f"センサーデータを送信: {len(response)} bytes")
-                return f"{response}\r\n".encode('utf-8')
-            
-            elif command == "ping":
-                return b'{"status": "pong"}\r\n'
-            
-            elif command == "status":
-                status = {
-                    "sensor_initialized": self.sensor_hub is not None,
-                    "running": self.running,
-                    "port": self.config.get("serial", "port")
-                }
-                response = json.dumps(status)
-                return f"{response}\r\n".encode('utf-8')
-            
-            else:
-                return b'{"error": "invalid command"}\r\n'
-                
+            return handler()
         except Exception as e:
-            self.logger.error(f"コマンド処理エラー: {e}")
+            self.logger.error("コマンド処理エラー: %s", e)
             error_response = json.dumps({"error": f"processing error: {str(e)}"})
             return f"{error_response}\r\n".encode('utf-8')
     
-    def _read_serial_data(self, serial_port: serial.Serial) -> Optional[str]:
-        """シリアルデータを読み取り"""
-        try:
-            if serial_port.in_waiting > 0:
-                line = serial_port.readline()
-                if line:
-                    decoded = line.decode('utf-8', errors='replace')
-                    return decoded
-        except (serial.SerialException, UnicodeDecodeError) as e:
-            self.logger.error(f"シリアル読み取りエラー: {e}")
-        return None
+    def _handle_get_sensor_data(self) -> bytes:
+        """get_sensor_data: センサーデータをJSONで返す"""
+        data = self.latest_data
+        if data is None:
+            return self._sensor_unavailable_response()
+        
+        if orjson is not None:
+            # orjsonはdataclassを直接シリアライズし、bytesを返す
+            response = orjson.dumps(data) + b"\r\n"
+        else:
+            # dataclassを辞書に変換してJSONシリアライズ
+            response = f"{json.dumps(data.to_dict(), ensure_ascii=False)}\r\n".encode('utf-8')
+        self.logger.debug("センサーデータを送信: %d bytes", len(response))
+        return response
+    
+    def _handle_get_sensor_data_msgpack(self) -> bytes:
+        """get_sensor_data_msgpack: センサーデータをMessagePackで返す"""
+        data = self.latest_data
+        if data is None:
+            return self._sensor_unavailable_response()
+        
+        # MessagePackはバイナリのため、改行ではなく4バイトの長さヘッダーで区切る
+        payload = msgpack.packb(data.to_dict(), use_bin_type=True)
+        self.logger.debug("センサーデータを送信(MessagePack): %d bytes", len(payload))
+        return pack_frame(payload)
+    
+    def _handle_get_sensor_data_bin(self) -> bytes:
+        """get_sensor_data_bin: センサーデータを固定長バイナリで返す"""
+        data = self.latest_data
+        if data is None:
+            return self._sensor_unavailable_response()
+        
+        payload = pack_sensor_data(data)
+        self.logger.debug("センサーデータを送信(バイナリ): %d bytes", len(payload))
+        return pack_frame(payload)
+    
+    def _handle_get_sensor_data_delta(self) -> bytes:
+        """get_sensor_data_delta: 前回送信値からの差分フレームを返す"""
+        data = self.latest_data
+        if data is None:
+            return self._sensor_unavailable_response()
+        
+        payload = self.delta_encoder.encode(data)
+        self.logger.debug("センサーデータを送信(差分): %d bytes", len(payload))
+        return pack_frame(payload)
+    
+    def _handle_get_sensor_data_keyframe(self) -> bytes:
+        """get_sensor_data_keyframe: 差分の基準をリセットしてキーフレームを返す"""
+        self.delta_encoder.reset()
+        return self._handle_get_sensor_data_delta()
+    
+    def _handle_ping(self) -> bytes:
+        """ping: 疎通確認"""
+        return PONG_RESPONSE
+    
+    def _handle_status(self) -> bytes:
+        """status: サーバー状態を返す"""
+        return (
+            b'{"sensor_initialized": '
+            + (b'true' if self.sensor_hub is not None else b'false')
+            + b', "running": '
+            + (b'true' if self.running else b'false')
+            + self._status_suffix
+        )
     
     def _write_serial_data(self, serial_port: serial.Serial, data: bytes) -> bool:
         """シリアルデータを書き込み"""
         try:
             serial_port.write(data)
-            serial_port.flush()
             return True
         except serial.SerialException as e:
-            self.logger.error(f"シリアル書き込みエラー: {e}")
+            self.logger.error("シリアル書き込みエラー: %s", e)
             return False
     
     def run(self):
@@ -244,37 +347,44 @@ class SensorSerialServer:
         
         try:
             with self._serial_connection() as serial_port:
+                # 起動処理中に停止要求を受けていた場合は、ループに入らずに終了する
+                if self._stop_requested:
+                    self.logger.info("起動中に停止要求を受けたため、サーバーを開始せずに終了します")
+                    return True
                 self.running = True
+                # 最初の読み取りが完了するまでは、latest_dataがNoneのためエラー応答となる
+                self._start_sensor_producer()
                 self.logger.info("サーバーが正常に開始されました")
                 
-                temp_data = ""
-                loop_interval = self.config.get("system", "loop_interval", 0.1)
+                pending = b''
                 
-                while self.running and not self.shutdown_event.is_set():
-                    # シリアルデータ読み取り
-                    data = self._read_serial_data(serial_port)
-                    if data:
-                        temp_data += data
+                while self.running and not self._stop_requested:
+                    # コマンド受信（停止要求時はshutdown()のcancel_read()で中断される）
+                    try:
+                        line = pending + serial_port.read_until(b'\n')
+                    except serial.SerialException as e:
+                        # ポートが失われた場合（USB切断等）は再試行せずに終了し、
+                        # systemdによる再起動に任せる
+                        self.logger.error("シリアル読み取りエラー: %s", e)
+                        return False
+                    # 改行前にタイムアウトした場合は次回の読み取りと結合する
+                    if not line.endswith(b'\n'):
+                        if len(line) > self._max_command_length:
+                            self.logger.warning("改行のない入力が上限を超過したため破棄: %d bytes", len(line))
+                            line = b''
+                        pending = line
+                        continue
+                    pending = b''
                     
-                    # コマンド完了チェック(最後に改行がある場合、コマンドを処理する)
-                    if '\n' in temp_data or '\r' in temp_data:
-                        if not temp_data.endswith('\n'):
-                            continue
-                        command = temp_data.rstrip('\n').rstrip('\r')
-                        if command:
-                            self.logger.info(f"コマンド受信: {command}")
-                            
-                            if self._validate_command(command):
-                                response = self._process_command(command)
-                                if self._write_serial_data(serial_port, response):
-                                    self.logger.debug(f"応答送信完了: {len(response)} bytes")
-                            else:
-                                error_response = b'{"error": "invalid command"}\r\n'
-                                self._write_serial_data(serial_port, error_response)
-                        temp_data = ""
-                    
-                    # CPU使用率を抑制
-                    time.sleep(loop_interval)
+                    command = line.strip()
+                    if command:
+                        # 引数のデコードはログ出力時のみ行う
+                        if self.logger.isEnabledFor(logging.INFO):
+                            self.logger.info("コマンド受信: %s", command.decode('utf-8', errors='replace'))
+                        
+                        response = self._process_command(command)
+                        if self._write_serial_data(serial_port, response):
+                            self.logger.debug("応答送信完了: %d bytes", len(response))
                 
                 self.logger.info("サーバーループを終了しました")
                 return True
@@ -288,15 +398,12 @@ class SensorSerialServer:
     def shutdown(self):
         """サーバーを停止"""
         self.logger.info("サーバーの停止を開始します...")
+        self._stop_requested = True
         self.running = False
-        self.shutdown_event.set()
         
-        # タイムアウト付きで停止を待機
-        timeout = self.config.get("system", "shutdown_timeout", 5.0)
-        if self.shutdown_event.wait(timeout):
-            self.logger.info("サーバーが正常に停止しました")
-        else:
-            self.logger.warning("サーバー停止がタイムアウトしました")
+        # 読み取り待ちを中断し、メインループに停止を即座に反映させる
+        if self.serial_port and self.serial_port.is_open:
+            self.serial_port.cancel_read()
 
 
 def main():